@@ -1,5 +1,7 @@
 -- University Database Schema
--- This script creates the university database and all required tables
+-- This script creates the university database and all required tables.
+-- It mirrors what university_db_performance.py creates: create_tables(),
+-- add_foreign_keys() and create_indexes().
 
 -- Create database (run this separately if needed)
 -- CREATE DATABASE university_db;
@@ -7,35 +9,37 @@
 -- Connect to university_db and create tables
 \c university_db;
 
+-- All tables are UNLOGGED: bulk loads and index builds write no WAL, and the
+-- benchmark data (emptied after a server crash) is regenerated or restored
+-- from snapshots. A partitioned parent can't be UNLOGGED; its partitions are.
+
 -- 1. Departments Table
-CREATE TABLE IF NOT EXISTS departments (
+CREATE UNLOGGED TABLE IF NOT EXISTS departments (
     department_id SERIAL PRIMARY KEY,
     department_name VARCHAR(100) NOT NULL,
     building VARCHAR(100) NOT NULL
 );
 
 -- 2. Teachers Table
-CREATE TABLE IF NOT EXISTS teachers (
+CREATE UNLOGGED TABLE IF NOT EXISTS teachers (
     teacher_id SERIAL PRIMARY KEY,
     first_name VARCHAR(50) NOT NULL,
     last_name VARCHAR(50) NOT NULL,
     email VARCHAR(100) UNIQUE NOT NULL,
     department_id INTEGER NOT NULL,
-    hire_date DATE NOT NULL,
-    FOREIGN KEY (department_id) REFERENCES departments(department_id)
+    hire_date DATE NOT NULL
 );
 
 -- 3. Courses Table
-CREATE TABLE IF NOT EXISTS courses (
+CREATE UNLOGGED TABLE IF NOT EXISTS courses (
     course_id SERIAL PRIMARY KEY,
     course_name VARCHAR(100) NOT NULL,
     credits INTEGER NOT NULL,
-    teacher_id INTEGER NOT NULL,
-    FOREIGN KEY (teacher_id) REFERENCES teachers(teacher_id)
+    teacher_id INTEGER NOT NULL
 );
 
 -- 4. Students Table
-CREATE TABLE IF NOT EXISTS students (
+CREATE UNLOGGED TABLE IF NOT EXISTS students (
     student_id SERIAL PRIMARY KEY,
     first_name VARCHAR(50) NOT NULL,
     last_name VARCHAR(50) NOT NULL,
@@ -44,31 +48,91 @@ CREATE TABLE IF NOT EXISTS students (
     date_of_birth DATE NOT NULL
 );
 
--- 5. Enrollments Table (Junction table)
+-- 5. Semesters Table (Lookup table)
+CREATE UNLOGGED TABLE IF NOT EXISTS semesters (
+    semester_id SMALLINT PRIMARY KEY,
+    semester_name VARCHAR(20) NOT NULL
+);
+
+-- 6. Enrollments Table (Junction table)
+-- Partitioned by semester; the primary key must include the partition key
 CREATE TABLE IF NOT EXISTS enrollments (
-    enrollment_id SERIAL PRIMARY KEY,
+    enrollment_id SERIAL,
     student_id INTEGER NOT NULL,
     course_id INTEGER NOT NULL,
-    semester VARCHAR(20) NOT NULL,
+    semester_id SMALLINT NOT NULL,
     grade INTEGER NOT NULL CHECK (grade >= 0 AND grade <= 100),
-    FOREIGN KEY (student_id) REFERENCES students(student_id),
-    FOREIGN KEY (course_id) REFERENCES courses(course_id)
-);
+    PRIMARY KEY (enrollment_id, semester_id)
+) PARTITION BY LIST (semester_id);
+
+CREATE UNLOGGED TABLE IF NOT EXISTS enrollments_1 PARTITION OF enrollments FOR VALUES IN (1);
+CREATE UNLOGGED TABLE IF NOT EXISTS enrollments_2 PARTITION OF enrollments FOR VALUES IN (2);
+CREATE UNLOGGED TABLE IF NOT EXISTS enrollments_3 PARTITION OF enrollments FOR VALUES IN (3);
+CREATE UNLOGGED TABLE IF NOT EXISTS enrollments_4 PARTITION OF enrollments FOR VALUES IN (4);
+
+-- Foreign keys are added after each bulk load, NOT VALID and then validated.
+-- The enrollments keys are declared on each partition: a permanent parent
+-- may not reference the unlogged tables.
+ALTER TABLE teachers ADD CONSTRAINT fk_teachers_department
+    FOREIGN KEY (department_id) REFERENCES departments(department_id) NOT VALID;
+ALTER TABLE teachers VALIDATE CONSTRAINT fk_teachers_department;
+ALTER TABLE courses ADD CONSTRAINT fk_courses_teacher
+    FOREIGN KEY (teacher_id) REFERENCES teachers(teacher_id) NOT VALID;
+ALTER TABLE courses VALIDATE CONSTRAINT fk_courses_teacher;
+
+ALTER TABLE enrollments_1 ADD CONSTRAINT fk_enrollments_student
+    FOREIGN KEY (student_id) REFERENCES students(student_id) NOT VALID;
+ALTER TABLE enrollments_1 VALIDATE CONSTRAINT fk_enrollments_student;
+ALTER TABLE enrollments_1 ADD CONSTRAINT fk_enrollments_course
+    FOREIGN KEY (course_id) REFERENCES courses(course_id) NOT VALID;
+ALTER TABLE enrollments_1 VALIDATE CONSTRAINT fk_enrollments_course;
+ALTER TABLE enrollments_1 ADD CONSTRAINT fk_enrollments_semester
+    FOREIGN KEY (semester_id) REFERENCES semesters(semester_id) NOT VALID;
+ALTER TABLE enrollments_1 VALIDATE CONSTRAINT fk_enrollments_semester;
+ALTER TABLE enrollments_2 ADD CONSTRAINT fk_enrollments_student
+    FOREIGN KEY (student_id) REFERENCES students(student_id) NOT VALID;
+ALTER TABLE enrollments_2 VALIDATE CONSTRAINT fk_enrollments_student;
+ALTER TABLE enrollments_2 ADD CONSTRAINT fk_enrollments_course
+    FOREIGN KEY (course_id) REFERENCES courses(course_id) NOT VALID;
+ALTER TABLE enrollments_2 VALIDATE CONSTRAINT fk_enrollments_course;
+ALTER TABLE enrollments_2 ADD CONSTRAINT fk_enrollments_semester
+    FOREIGN KEY (semester_id) REFERENCES semesters(semester_id) NOT VALID;
+ALTER TABLE enrollments_2 VALIDATE CONSTRAINT fk_enrollments_semester;
+ALTER TABLE enrollments_3 ADD CONSTRAINT fk_enrollments_student
+    FOREIGN KEY (student_id) REFERENCES students(student_id) NOT VALID;
+ALTER TABLE enrollments_3 VALIDATE CONSTRAINT fk_enrollments_student;
+ALTER TABLE enrollments_3 ADD CONSTRAINT fk_enrollments_course
+    FOREIGN KEY (course_id) REFERENCES courses(course_id) NOT VALID;
+ALTER TABLE enrollments_3 VALIDATE CONSTRAINT fk_enrollments_course;
+ALTER TABLE enrollments_3 ADD CONSTRAINT fk_enrollments_semester
+    FOREIGN KEY (semester_id) REFERENCES semesters(semester_id) NOT VALID;
+ALTER TABLE enrollments_3 VALIDATE CONSTRAINT fk_enrollments_semester;
+ALTER TABLE enrollments_4 ADD CONSTRAINT fk_enrollments_student
+    FOREIGN KEY (student_id) REFERENCES students(student_id) NOT VALID;
+ALTER TABLE enrollments_4 VALIDATE CONSTRAINT fk_enrollments_student;
+ALTER TABLE enrollments_4 ADD CONSTRAINT fk_enrollments_course
+    FOREIGN KEY (course_id) REFERENCES courses(course_id) NOT VALID;
+ALTER TABLE enrollments_4 VALIDATE CONSTRAINT fk_enrollments_course;
+ALTER TABLE enrollments_4 ADD CONSTRAINT fk_enrollments_semester
+    FOREIGN KEY (semester_id) REFERENCES semesters(semester_id) NOT VALID;
+ALTER TABLE enrollments_4 VALIDATE CONSTRAINT fk_enrollments_semester;
 
 -- Create indexes for better performance (Phase 2)
--- These will be created after initial testing
+-- These will be created after initial testing, on the fully loaded tables
+
+-- Query 1: covering index on Students for enrollment_date (index-only scan)
+CREATE INDEX IF NOT EXISTS idx_students_enrollment_covering ON students(enrollment_date) INCLUDE (student_id, first_name, last_name);
 
--- Index on Students table for enrollment_date
-CREATE INDEX IF NOT EXISTS idx_students_enrollment_date ON students(enrollment_date);
+-- Query 2: enrollments by course, and courses by teacher
+CREATE INDEX IF NOT EXISTS idx_enrollments_course_student ON enrollments(course_id, student_id);
+CREATE INDEX IF NOT EXISTS idx_courses_teacher_course ON courses(teacher_id) INCLUDE (course_id);
 
--- Indexes on Enrollments table
-CREATE INDEX IF NOT EXISTS idx_enrollments_student_id ON enrollments(student_id);
-CREATE INDEX IF NOT EXISTS idx_enrollments_course_id ON enrollments(course_id);
-CREATE INDEX IF NOT EXISTS idx_enrollments_semester ON enrollments(semester);
+-- Query 3: substring search on course names (needs the pg_trgm extension)
+CREATE EXTENSION IF NOT EXISTS pg_trgm SCHEMA public;
+CREATE INDEX IF NOT EXISTS idx_courses_name_trgm ON courses USING gin (course_name gin_trgm_ops);
 
--- Indexes on Courses table
-CREATE INDEX IF NOT EXISTS idx_courses_teacher_id ON courses(teacher_id);
-CREATE INDEX IF NOT EXISTS idx_courses_course_name ON courses(course_name);
+-- Query 4: teachers by department
+CREATE INDEX IF NOT EXISTS idx_teachers_dept_teacher ON teachers(department_id) INCLUDE (teacher_id);
 
--- Index on Teachers table
-CREATE INDEX IF NOT EXISTS idx_teachers_department_id ON teachers(department_id);
+-- Query 5: partial covering index on the Spring 2025 enrollments
+CREATE INDEX IF NOT EXISTS idx_enrollments_spring25 ON enrollments(student_id) INCLUDE (grade) WHERE semester_id = 4;
@@ -1,10 +1,28 @@
 # Database Configuration for University Performance Analysis
 # Update these values according to your PostgreSQL setup
+# Connection settings can be overridden with the standard PGHOST, PGPORT and
+# PGUSER variables. The password is never stored here: it is read from
+# PGPASSWORD, and when that is unset libpq falls back to ~/.pgpass.
+import os
 
 DB_CONFIG = {
-    'host': 'localhost',
+    'host': os.environ.get('PGHOST', 'localhost'),
     'database': 'uni',
-    'user': 'postgres',
-    'password': 'usman9522',
-    'port': 5432
+    'user': os.environ.get('PGUSER', 'postgres'),
+    'password': os.environ.get('PGPASSWORD'),
+    'port': int(os.environ.get('PGPORT', '5432'))
 }
+
+# Shared connection pool built from DB_CONFIG. It is created on first use so
+# importing this module stays cheap; callers borrow connections with
+# get_pool().getconn() and return them with get_pool().putconn(conn).
+# For many concurrent clients, point DB_CONFIG at a pgbouncer instance
+# running in transaction pooling mode instead of PostgreSQL directly.
+DB_POOL = None
+
+def get_pool(minconn=5, maxconn=25):
+    global DB_POOL
+    if DB_POOL is None:
+        from psycopg2.pool import ThreadedConnectionPool
+        DB_POOL = ThreadedConnectionPool(minconn=minconn, maxconn=maxconn, **DB_CONFIG)
+    return DB_POOL
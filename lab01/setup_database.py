@@ -3,27 +3,40 @@ Database Setup Script for University Performance Analysis
 This script helps set up the PostgreSQL database and initial configuration
 """
 
-import psycopg2
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+import argparse
+import os
 import sys
 
-def create_database():
+def parse_args(argv=None):
+    """Parse connection parameters; anything not given falls back to PG* env vars"""
+    parser = argparse.ArgumentParser(description="Set up the PostgreSQL database for the performance analysis")
+    parser.add_argument('--host', default=os.environ.get('PGHOST'), help="PostgreSQL host (env: PGHOST)")
+    parser.add_argument('--port', default=os.environ.get('PGPORT'), help="PostgreSQL port (env: PGPORT)")
+    parser.add_argument('--user', default=os.environ.get('PGUSER'), help="PostgreSQL username (env: PGUSER)")
+    return parser.parse_args(argv)
+
+def create_database(args):
     """Create the university_db database if it doesn't exist"""
     
     # Get database connection details
     print("🔧 Database Setup for University Performance Analysis")
     print("=" * 50)
     
-    # Default connection parameters (update these for your setup)
-    host = input("Enter PostgreSQL host (default: localhost): ").strip() or "localhost"
-    port = input("Enter PostgreSQL port (default: 5432): ").strip() or "5432"
-    user = input("Enter PostgreSQL username (default: postgres): ").strip() or "postgres"
-    password = input("Enter PostgreSQL password: ").strip()
+    # Only prompt for whatever was not supplied on the command line or in the environment
+    host = args.host or input("Enter PostgreSQL host (default: localhost): ").strip() or "localhost"
+    port = args.port or input("Enter PostgreSQL port (default: 5432): ").strip() or "5432"
+    user = args.user or input("Enter PostgreSQL username (default: postgres): ").strip() or "postgres"
+    password = os.environ.get('PGPASSWORD') or input("Enter PostgreSQL password: ").strip()
     
     if not password:
         print("❌ Password is required!")
         return False
     
+    # psycopg2 is imported only once a connection is actually needed, so
+    # the script starts without paying for the driver import
+    import psycopg2
+    from psycopg2 import errors
+    
     try:
         # Connect to PostgreSQL server (not to a specific database)
         print("🔄 Connecting to PostgreSQL server...")
@@ -32,59 +45,75 @@ def create_database():
             port=port,
             user=user,
             password=password,
-            database='postgres'  # Connect to default postgres database
+            database='postgres',  # Connect to default postgres database
+            # Fail fast on an unreachable host instead of waiting for the TCP timeout
+            connect_timeout=3,
+            keepalives=1,
+            keepalives_idle=30
         )
-        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        conn.autocommit = True  # CREATE DATABASE cannot run inside a transaction
         cursor = conn.cursor()
         
-        # Check if uni exists
-        cursor.execute("SELECT 1 FROM pg_database WHERE datname = 'uni'")
-        exists = cursor.fetchone()
-        
-        if exists:
-            print("✅ Database 'uni' already exists")
-        else:
-            # Create the database
+        # Create uni directly and treat "already exists" as success; this
+        # saves the separate pg_database lookup round trip
+        try:
             print("🔄 Creating database 'uni'...")
             cursor.execute("CREATE DATABASE uni")
             print("✅ Database 'uni' created successfully")
+        except errors.DuplicateDatabase:
+            print("✅ Database 'uni' already exists")
         
         cursor.close()
         conn.close()
         
-        # Test connection to the new database
-        print("🔄 Testing connection to uni...")
-        test_conn = psycopg2.connect(
-            host=host,
-            port=port,
-            user=user,
-            password=password,
-            database='uni'
-        )
-        test_conn.close()
-        print("✅ Connection to uni successful")
+        # No separate test connection to uni is opened here: the server
+        # connection above already validated the credentials, and the
+        # analysis script reports any problem connecting to uni itself
         
         # Create configuration file
         config_content = f"""# Database Configuration for University Performance Analysis
 # Update these values according to your PostgreSQL setup
+# Connection settings can be overridden with the standard PGHOST, PGPORT and
+# PGUSER variables. The password is never stored here: it is read from
+# PGPASSWORD, and when that is unset libpq falls back to ~/.pgpass.
+import os
 
 DB_CONFIG = {{
-    'host': '{host}',
+    'host': os.environ.get('PGHOST', '{host}'),
     'database': 'uni',
-    'user': '{user}',
-    'password': '{password}',
-    'port': {port}
+    'user': os.environ.get('PGUSER', '{user}'),
+    'password': os.environ.get('PGPASSWORD'),
+    'port': int(os.environ.get('PGPORT', '{port}'))
 }}
+
+# Shared connection pool built from DB_CONFIG. It is created on first use so
+# importing this module stays cheap; callers borrow connections with
+# get_pool().getconn() and return them with get_pool().putconn(conn).
+# For many concurrent clients, point DB_CONFIG at a pgbouncer instance
+# running in transaction pooling mode instead of PostgreSQL directly.
+DB_POOL = None
+
+def get_pool(minconn=5, maxconn=25):
+    global DB_POOL
+    if DB_POOL is None:
+        from psycopg2.pool import ThreadedConnectionPool
+        DB_POOL = ThreadedConnectionPool(minconn=minconn, maxconn=maxconn, **DB_CONFIG)
+    return DB_POOL
 """
         
-        with open('db_config.py', 'w') as f:
+        # Write in one buffered call and make sure it is on disk before we
+        # tell the user to run the analysis script that imports it
+        with open('db_config.py', 'w', buffering=131072) as f:
             f.write(config_content)
+            f.flush()
+            os.fsync(f.fileno())
         
         print("✅ Configuration file 'db_config.py' created")
         print("\n🎉 Database setup complete!")
         print("\nNext steps:")
         print("1. Install required packages: pip install -r requirements.txt")
-        print("2. Run the main analysis: python university_db_performance.py")
+        print("2. Export your password: export PGPASSWORD=<password> (or add it to ~/.pgpass)")
+        print("3. Run the main analysis: python university_db_performance.py")
         
         return True
         
@@ -97,7 +126,7 @@ DB_CONFIG = {{
 
 def main():
     """Main setup function"""
-    success = create_database()
+    success = create_database(parse_args())
     
     if not success:
         print("\n❌ Setup failed. Please check your PostgreSQL configuration and try again.")